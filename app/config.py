@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 import os
@@ -55,6 +56,9 @@ class Settings(BaseSettings):
     MAX_CONCURRENT_CRAWLS: int = 5
     CRAWLER_POOL_SIZE: int = 10
 
+    # 统一中间件：认证/限流/日志/错误处理合并为单次ASGI遍历
+    UNIFIED_MIDDLEWARE: bool = False
+
     # 速率限制
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_CALLS: int = 100
@@ -116,5 +120,12 @@ class Settings(BaseSettings):
         }
 
 
-# 创建全局配置实例
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    获取全局配置实例
+
+    惰性构造并缓存：.env解析和字段验证只在首次调用时执行一次，
+    多worker场景下避免在导入期重复付出解析开销。
+    """
+    return Settings()
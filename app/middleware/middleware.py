@@ -1,175 +1,428 @@
+import asyncio
+import hashlib
+import heapq
+import hmac
 import time
 import logging
-from typing import Callable, Dict
-from collections import defaultdict, deque
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
 
-from fastapi import Request, Response, HTTPException
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+import orjson
 
-from app.config import settings
+from app.config import get_settings
 from app.utils.exceptions import RateLimitError, AuthenticationError
 
+settings = get_settings()
+
 logger = logging.getLogger(__name__)
 
+# 速率限制状态的最大客户端数量，超出时压缩淘汰已过期的客户端
+_MAX_TRACKED_CLIENTS = 100_000
+
+
+@dataclass(frozen=True, slots=True)
+class _MiddlewareConfig:
+    """中间件热路径用到的配置快照
+
+    Pydantic Settings的字段访问要经过描述符协议，每请求读取
+    有可观测的开销；构造中间件时固化为冻结的slots数据类，
+    热路径上只剩一次普通属性加载。运行期配置本就不变，
+    快照不会过期。
+    """
+    rate_limit_enabled: bool
+    rate_limit_calls: int
+    rate_limit_period: int
+    api_key_enabled: bool
+
+
+@lru_cache(maxsize=1)
+def _snapshot_config() -> _MiddlewareConfig:
+    """从全局Settings固化中间件配置快照（只构建一次）"""
+    return _MiddlewareConfig(
+        rate_limit_enabled=settings.RATE_LIMIT_ENABLED,
+        rate_limit_calls=settings.RATE_LIMIT_CALLS,
+        rate_limit_period=settings.RATE_LIMIT_PERIOD,
+        api_key_enabled=settings.API_KEY_ENABLED,
+    )
+
+# API密钥摘要集合，首次使用时从配置构建（运行期配置不会变化）
+_API_KEY_DIGESTS: "frozenset[bytes] | None" = None
+
+
+def _get_api_key_digests() -> "frozenset[bytes]":
+    """惰性构建API密钥的blake2b摘要frozenset
+
+    校验时比较的是请求密钥的摘要而非明文：成员检查仍是O(1)，
+    且逐字节比较发生在定长的不可预测摘要上，等价于
+    hmac.compare_digest的效果——比较耗时不再泄露与真实密钥
+    匹配的前缀长度。（明文密钥仍保存在settings.API_KEYS中，
+    这里只改变比较方式，并不减少明文在内存中的驻留。）
+    """
+    global _API_KEY_DIGESTS
+    if _API_KEY_DIGESTS is None:
+        _API_KEY_DIGESTS = frozenset(
+            hashlib.blake2b(key.encode()).digest()
+            for key in settings.API_KEYS
+        )
+    return _API_KEY_DIGESTS
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+# 完美哈希表：(槽位掩码, 摘要元组)，构建失败（密钥过多或首字节
+# 冲突无法消除）时为None，回退到frozenset成员检查
+_API_KEY_TABLE: "Tuple[int, tuple] | None" = None
+_API_KEY_TABLE_BUILT = False
+
+
+def _build_api_key_table() -> "Tuple[int, tuple] | None":
+    """为不超过64个密钥的部署构建完美哈希表
+
+    槽位由摘要首字节按掩码取模直接给出：blake2b输出均匀分布，
+    小规模密钥集合几乎总能在不超过256槽内做到无冲突。
+    构建不成功时返回None，调用方回退到frozenset路径。
+    """
+    digests = [hashlib.blake2b(key.encode()).digest()
+               for key in settings.API_KEYS]
+    if not 0 < len(digests) <= 64:
+        return None
+    size = 1
+    while size < len(digests):
+        size <<= 1
+    while size <= 256:
+        mask = size - 1
+        table: list = [None] * size
+        for digest in digests:
+            slot = digest[0] & mask
+            if table[slot] is not None:
+                break  # 首字节冲突，扩大表重试
+            table[slot] = digest
+        else:
+            return (mask, tuple(table))
+        size <<= 1
+    return None
+
+
+def _check_api_key(api_key: str) -> bool:
+    """校验API密钥是否有效
+
+    常见部署只有少量密钥：完美哈希表用摘要首字节直接定位唯一
+    候选槽位，随后hmac.compare_digest做定时安全的全摘要比对——
+    每次校验只有一次索引加一次比较。密钥超过64个或表构建失败时
+    回退到摘要frozenset的成员检查。
     """
-    速率限制中间件
+    global _API_KEY_TABLE, _API_KEY_TABLE_BUILT
+    if not _API_KEY_TABLE_BUILT:
+        _API_KEY_TABLE = _build_api_key_table()
+        _API_KEY_TABLE_BUILT = True
+    digest = hashlib.blake2b(api_key.encode()).digest()
+    if _API_KEY_TABLE is not None:
+        mask, table = _API_KEY_TABLE
+        expected = table[digest[0] & mask]
+        return expected is not None and hmac.compare_digest(digest, expected)
+    return digest in _get_api_key_digests()
+
+
+def _get_header(scope: dict, name: bytes) -> str:
+    """从ASGI scope中读取请求头（小写字节名），不存在时返回空字符串"""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+
+async def _send_body(send: Callable, status_code: int, body: bytes) -> None:
+    """发送已序列化好的JSON响应体（用于中间件提前终止请求）"""
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send: Callable, status_code: int, payload) -> None:
+    """序列化并发送一个JSON响应（动态消息走orjson的C实现）"""
+    await _send_body(send, status_code, orjson.dumps({"detail": payload}))
+
+
+# 消息固定的错误响应体在导入期一次性序列化为字节，
+# 发送时零序列化开销（错误高发场景下这是热路径）
+_BODY_INTERNAL_ERROR = orjson.dumps({"detail": "Internal server error"})
+_BODY_MISSING_AUTH = orjson.dumps(
+    {"detail": "Missing or invalid authorization header"})
+_BODY_INVALID_KEY = orjson.dumps({"detail": "Invalid API key"})
+
+
+class RateLimitMiddleware:
+    """
+    速率限制中间件（纯ASGI实现，避免BaseHTTPMiddleware的每请求任务组开销）
+
+    基于令牌桶算法实现API调用频率限制：每个客户端的全部状态打包进
+    一个Python整数——高位是剩余令牌数，低32位是上次补充令牌的
+    单调毫秒时间戳。每次请求只需一次字典查找加几条移位/掩码运算，
+    令牌按经过时间整数补充，无需为每个请求保存时间戳，
+    内存和每次请求的开销都是O(1)。
 
-    基于滑动窗口算法实现API调用频率限制
+    毫秒时间戳截断到32位（约49.7天回绕一次），经过时间用
+    (now - last) & 0xFFFFFFFF的模运算计算，回绕时结果依然正确。
     """
 
-    def __init__(self, app, calls: int = 100, period: int = 60):
-        super().__init__(app)
+    # 32位毫秒时间戳掩码
+    _MS_MASK = 0xFFFFFFFF
+
+    def __init__(self, app, calls: int = 100, period: int = 60,
+                 time_source: Callable[[], int] = time.monotonic_ns):
+        self.app = app
         self.calls = calls
         self.period = period
-        self.requests: Dict[str, deque] = defaultdict(deque)
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if not settings.RATE_LIMIT_ENABLED:
-            return await call_next(request)
+        # 时钟可注入：验证限流行为时传入假时钟即可瞬时推进时间，
+        # 无需真实sleep。默认仍是整数纳秒的单调时钟，
+        # 避免每请求的浮点分配且不受NTP等墙钟跳变影响
+        self._time_source = time_source
+        # 令牌运算全部采用单调时钟的整数毫秒
+        self._period_ms = period * 1000
+        # 构造时固化配置快照，热路径上省去Pydantic属性描述符开销
+        self._enabled = _snapshot_config().rate_limit_enabled
+        # client_id -> (tokens << 32) | last_refill_ms
+        self._state: Dict[str, int] = {}
+        # 后台清扫任务，首次请求时在事件循环上惰性启动
+        self._sweeper: "asyncio.Task | None" = None
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._enabled:
+            return await self.app(scope, receive, send)
+
+        # 惰性启动后台清扫任务（构造时还没有事件循环）
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
 
         # 获取客户端标识（IP或API Key）
-        client_id = self._get_client_id(request)
-        now = time.time()
-
-        # 清理过期的请求记录
-        requests = self.requests[client_id]
-        while requests and requests[0] < now - self.period:
-            requests.popleft()
+        client_id = self._get_client_id(scope)
+        now_ms = self._time_source() // 1_000_000 & self._MS_MASK
+
+        packed = self._state.get(client_id)
+        if packed is None:
+            if len(self._state) >= _MAX_TRACKED_CLIENTS:
+                self._compact()
+                # 全部条目都仍活跃时压缩清不掉任何东西，
+                # 改为按空闲时长批量淘汰，保证容量硬上界
+                if len(self._state) >= _MAX_TRACKED_CLIENTS:
+                    self._evict_oldest(now_ms)
+            tokens, last = self.calls, now_ms
+        else:
+            tokens = packed >> 32
+            last = packed & self._MS_MASK
+            # 按经过时间整数补充令牌；只在真正补入令牌时推进last，
+            # 避免不足一个令牌的零头在高频请求下被反复丢弃
+            refill = ((now_ms - last) & self._MS_MASK) \
+                * self.calls // self._period_ms
+            if refill:
+                tokens = min(self.calls, tokens + refill)
+                last = (last + refill * self._period_ms // self.calls) \
+                    & self._MS_MASK
 
         # 检查是否超过限制
-        if len(requests) >= self.calls:
-            logger.warning(f"Rate limit exceeded for client: {client_id}")
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "error": "Rate limit exceeded",
-                    "retry_after": int(requests[0] + self.period - now)
-                }
-            )
-
-        # 记录当前请求
-        requests.append(now)
-
-        # 添加速率限制信息到响应头
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.calls)
-        response.headers["X-RateLimit-Remaining"] = str(
-            self.calls - len(requests))
-        response.headers["X-RateLimit-Reset"] = str(int(now + self.period))
-
-        return response
-
-    def _get_client_id(self, request: Request) -> str:
+        if tokens == 0:
+            logger.warning("Rate limit exceeded for client: %s", client_id)
+            # 距下一个令牌生成的秒数（向上取整）
+            retry_after = -(-self._period_ms // self.calls // 1000) or 1
+            return await _send_json(send, 429, {
+                "error": "Rate limit exceeded",
+                "retry_after": retry_after
+            })
+
+        # 消耗一个令牌并写回打包状态
+        tokens -= 1
+        self._state[client_id] = (tokens << 32) | last
+
+        # 包装send，在响应头中注入速率限制信息
+        limit_headers = [
+            (b"x-ratelimit-limit", str(self.calls).encode("latin-1")),
+            (b"x-ratelimit-remaining", str(tokens).encode("latin-1")),
+            # 距令牌桶补满的秒数（delta形式）
+            (b"x-ratelimit-reset",
+             str((self.calls - tokens) * self._period_ms
+                 // self.calls // 1000).encode("latin-1")),
+        ]
+
+        async def send_with_headers(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message["headers"]) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    async def _sweep(self) -> None:
+        """周期性丢弃已恢复到满桶的空闲客户端，防止状态无限增长"""
+        while True:
+            await asyncio.sleep(self.period)
+            if self._state:
+                self._compact()
+
+    def _compact(self) -> None:
+        """丢弃超过2个周期未活动的客户端"""
+        now_ms = self._time_source() // 1_000_000 & self._MS_MASK
+        expire_ms = 2 * self._period_ms
+        self._state = {
+            client_id: packed
+            for client_id, packed in self._state.items()
+            if (now_ms - (packed & self._MS_MASK)) & self._MS_MASK < expire_ms
+        }
+
+    def _evict_oldest(self, now_ms: int) -> None:
+        """按上次补充令牌的时间批量淘汰最旧的一批客户端
+
+        持续的大量独立IP会让全部条目都处于活跃窗口内，_compact()
+        什么也清不掉；此时一次淘汰1/8容量的最久未活动条目，
+        既保证表大小有硬上界，又不至于每个新客户端都触发全表扫描。
+        """
+        evict = _MAX_TRACKED_CLIENTS // 8
+        mask = self._MS_MASK
+        for client_id, _ in heapq.nlargest(
+                evict, self._state.items(),
+                key=lambda kv: (now_ms - (kv[1] & mask)) & mask):
+            del self._state[client_id]
+
+    def _get_client_id(self, scope: dict) -> str:
         """获取客户端标识"""
         # 优先使用API Key
-        auth_header = request.headers.get("Authorization")
-        if auth_header and auth_header.startswith("Bearer "):
+        auth_header = _get_header(scope, b"authorization")
+        if auth_header.startswith("Bearer "):
             return auth_header[7:]
 
-        # 否则使用IP地址
-        forwarded = request.headers.get("X-Forwarded-For")
+        # 否则使用IP地址（只切出第一段，避免split产生的整表分配）
+        forwarded = _get_header(scope, b"x-forwarded-for")
         if forwarded:
-            return forwarded.split(",")[0]
-        return request.client.host if request.client else "unknown"
+            comma = forwarded.find(",")
+            return forwarded if comma == -1 else forwarded[:comma]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
+class APIKeyMiddleware:
     """
-    API密钥认证中间件
+    API密钥认证中间件（纯ASGI实现）
     """
 
     def __init__(self, app):
-        super().__init__(app)
-        self.excluded_paths = ["/", "/docs", "/redoc",
-                               "/openapi.json", "/api/version", "/api/crawl/health"]
+        self.app = app
+        # 构造时固化配置快照，热路径上省去Pydantic属性描述符开销
+        self._enabled = _snapshot_config().api_key_enabled
+        self.excluded_paths = frozenset([
+            "/", "/docs", "/redoc",
+            "/openapi.json", "/api/version", "/api/crawl/health"])
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        if not settings.API_KEY_ENABLED:
-            return await call_next(request)
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._enabled:
+            return await self.app(scope, receive, send)
 
         # 排除不需要认证的路径
-        if request.url.path in self.excluded_paths:
-            return await call_next(request)
+        if scope["path"] in self.excluded_paths:
+            return await self.app(scope, receive, send)
 
         # 检查API密钥
-        auth_header = request.headers.get("Authorization")
-        if not auth_header or not auth_header.startswith("Bearer "):
-            raise HTTPException(
-                status_code=401,
-                detail="Missing or invalid authorization header"
-            )
+        auth_header = _get_header(scope, b"authorization")
+        if not auth_header.startswith("Bearer "):
+            return await _send_body(send, 401, _BODY_MISSING_AUTH)
 
         api_key = auth_header[7:]
-        if api_key not in settings.API_KEYS:
-            logger.warning(f"Invalid API key attempted: {api_key[:8]}...")
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid API key"
-            )
+        if not _check_api_key(api_key):
+            logger.warning("Invalid API key attempted: %s...", api_key[:8])
+            return await _send_body(send, 401, _BODY_INVALID_KEY)
 
-        # 将API密钥添加到请求状态中
-        request.state.api_key = api_key
+        # 将API密钥添加到scope状态中，供后续处理使用
+        scope.setdefault("state", {})["api_key"] = api_key
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
+class LoggingMiddleware:
     """
-    请求日志中间件
+    请求日志中间件（纯ASGI实现）
+
+    每个请求只产出一条结构化JSON记录（orjson序列化），
+    相比请求/响应各记一条的方案日志I/O减半，且字段化的记录
+    无需下游再做正则解析。计时采用perf_counter_ns：
+    它是分辨率最高的单调时钟，适合度量单请求这类短区间。
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+    def __init__(self, app):
+        self.app = app
 
-        # 记录请求信息
-        logger.info(f"Request: {request.method} {request.url.path}")
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        # INFO级别被过滤时完全跳过计时、序列化和响应头注入
+        if scope["type"] != "http" or not logger.isEnabledFor(logging.INFO):
+            return await self.app(scope, receive, send)
 
-        try:
-            response = await call_next(request)
+        start_ns = time.perf_counter_ns()
+        method = scope["method"]
+        path = scope["path"]
+
+        status_code = 500
 
-            # 记录响应信息
-            duration = time.time() - start_time
-            logger.info(
-                f"Response: {request.method} {request.url.path} "
-                f"- Status: {response.status_code} - Duration: {duration:.3f}s"
-            )
+        async def send_with_timing(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = (time.perf_counter_ns() - start_ns) / 1e9
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-response-time", f"{duration:.3f}".encode("latin-1"))
+                ]
+            await send(message)
 
-            # 添加响应时间头
-            response.headers["X-Response-Time"] = f"{duration:.3f}"
+        try:
+            await self.app(scope, receive, send_with_timing)
 
-            return response
+            # 单条结构化访问日志（请求与响应信息合并）
+            logger.info("%s", orjson.dumps({
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "duration_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
+            }).decode())
 
         except Exception as e:
-            duration = time.time() - start_time
-            logger.error(
-                f"Error: {request.method} {request.url.path} "
-                f"- Exception: {str(e)} - Duration: {duration:.3f}s"
-            )
+            logger.error("%s", orjson.dumps({
+                "method": method,
+                "path": path,
+                "error": str(e),
+                "duration_ms": (time.perf_counter_ns() - start_ns) // 1_000_000,
+            }).decode())
             raise
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     """
-    全局错误处理中间件
+    全局错误处理中间件（纯ASGI实现）
+
+    异常类型到状态码的映射在类定义时固化为查找表，
+    捕获后沿type(exc).__mro__查表分发：新增异常类型只需加一个
+    表项而不是再挂一个except子句，且派生异常自动落到基类的表项。
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    # 异常类型 -> HTTP状态码（子类通过MRO查找命中基类表项）
+    _HANDLERS: Dict[type, int] = {
+        RateLimitError: 429,
+        AuthenticationError: 401,
+    }
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
         try:
-            return await call_next(request)
-        except HTTPException:
-            # FastAPI的HTTPException由FastAPI自己处理
-            raise
-        except RateLimitError as e:
-            raise HTTPException(status_code=429, detail=str(e))
-        except AuthenticationError as e:
-            raise HTTPException(status_code=401, detail=str(e))
+            await self.app(scope, receive, send)
         except Exception as e:
-            logger.error(f"Unhandled exception: {str(e)}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail="Internal server error"
-            )
+            handlers = self._HANDLERS
+            for klass in type(e).__mro__:
+                status_code = handlers.get(klass)
+                if status_code is not None:
+                    return await _send_json(send, status_code, str(e))
+            logger.error("Unhandled exception: %s", e, exc_info=True)
+            await _send_body(send, 500, _BODY_INTERNAL_ERROR)
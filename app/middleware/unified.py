@@ -0,0 +1,213 @@
+"""统一中间件：认证、限流、计时与错误处理合并为单次ASGI遍历
+
+四个独立中间件串联时，每个请求要经过四层__call__调度、
+两次请求头扫描和两个send包装闭包。本模块把同样的逻辑压进
+一个中间件：请求头只扫描一次（同时取出authorization与
+x-forwarded-for），send只包装一层，异常表、令牌桶与API密钥
+摘要校验与独立实现共享同一套辅助函数，行为保持一致。
+
+通过settings.UNIFIED_MIDDLEWARE开关启用（见main.py）。
+"""
+import asyncio
+import heapq
+import logging
+import time
+from typing import Callable, Dict
+
+import orjson
+
+from app.middleware.middleware import (
+    _BODY_INTERNAL_ERROR,
+    _BODY_INVALID_KEY,
+    _BODY_MISSING_AUTH,
+    _MAX_TRACKED_CLIENTS,
+    ErrorHandlerMiddleware,
+    _check_api_key,
+    _send_body,
+    _send_json,
+    _snapshot_config,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UnifiedMiddleware:
+    """认证 + 限流 + 访问日志 + 错误处理的单遍实现（纯ASGI）"""
+
+    # 32位毫秒时间戳掩码（与RateLimitMiddleware一致）
+    _MS_MASK = 0xFFFFFFFF
+
+    # 不需要认证的路径（与APIKeyMiddleware一致）
+    _EXCLUDED_PATHS = frozenset([
+        "/", "/docs", "/redoc",
+        "/openapi.json", "/api/version", "/api/crawl/health"])
+
+    # 异常类型 -> HTTP状态码，直接复用错误处理中间件的查找表
+    _HANDLERS: Dict[type, int] = ErrorHandlerMiddleware._HANDLERS
+
+    def __init__(self, app, calls: int = None, period: int = None,
+                 time_source: Callable[[], int] = time.monotonic_ns):
+        self.app = app
+        # 构造时固化配置快照，热路径上省去Pydantic属性描述符开销
+        config = _snapshot_config()
+        self.calls = calls if calls is not None else config.rate_limit_calls
+        self.period = (period if period is not None
+                       else config.rate_limit_period)
+        self._period_ms = self.period * 1000
+        self._time_source = time_source
+        self._rate_enabled = config.rate_limit_enabled
+        self._auth_enabled = config.api_key_enabled
+        # client_id -> (tokens << 32) | last_refill_ms（与RateLimitMiddleware一致）
+        self._state: Dict[str, int] = {}
+        self._sweeper: "asyncio.Task | None" = None
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        log_enabled = logger.isEnabledFor(logging.INFO)
+        start_ns = time.perf_counter_ns() if log_enabled else 0
+        method = scope["method"]
+        path = scope["path"]
+
+        # 单次请求头扫描，同时取出认证与转发头
+        auth_header = ""
+        forwarded = ""
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                auth_header = value.decode("latin-1")
+            elif key == b"x-forwarded-for":
+                forwarded = value.decode("latin-1")
+
+        # ---- 认证 ----
+        api_key = ""
+        if auth_header.startswith("Bearer "):
+            api_key = auth_header[7:]
+        if self._auth_enabled and path not in self._EXCLUDED_PATHS:
+            if not api_key:
+                return await _send_body(send, 401, _BODY_MISSING_AUTH)
+            if not _check_api_key(api_key):
+                logger.warning("Invalid API key attempted: %s...", api_key[:8])
+                return await _send_body(send, 401, _BODY_INVALID_KEY)
+            scope.setdefault("state", {})["api_key"] = api_key
+
+        # ---- 限流（打包整数令牌桶，与RateLimitMiddleware相同的算法）----
+        limit_headers = []
+        if self._rate_enabled:
+            if self._sweeper is None:
+                self._sweeper = asyncio.create_task(self._sweep())
+
+            if api_key:
+                client_id = api_key
+            elif forwarded:
+                comma = forwarded.find(",")
+                client_id = forwarded if comma == -1 else forwarded[:comma]
+            else:
+                client = scope.get("client")
+                client_id = client[0] if client else "unknown"
+
+            now_ms = self._time_source() // 1_000_000 & self._MS_MASK
+            packed = self._state.get(client_id)
+            if packed is None:
+                if len(self._state) >= _MAX_TRACKED_CLIENTS:
+                    self._compact()
+                    # 全部条目都仍活跃时压缩清不掉任何东西，
+                    # 改为按空闲时长批量淘汰，保证容量硬上界
+                    if len(self._state) >= _MAX_TRACKED_CLIENTS:
+                        self._evict_oldest(now_ms)
+                tokens, last = self.calls, now_ms
+            else:
+                tokens = packed >> 32
+                last = packed & self._MS_MASK
+                refill = ((now_ms - last) & self._MS_MASK) \
+                    * self.calls // self._period_ms
+                if refill:
+                    tokens = min(self.calls, tokens + refill)
+                    last = (last + refill * self._period_ms // self.calls) \
+                        & self._MS_MASK
+
+            if tokens == 0:
+                logger.warning("Rate limit exceeded for client: %s", client_id)
+                retry_after = -(-self._period_ms // self.calls // 1000) or 1
+                return await _send_json(send, 429, {
+                    "error": "Rate limit exceeded",
+                    "retry_after": retry_after
+                })
+
+            tokens -= 1
+            self._state[client_id] = (tokens << 32) | last
+            limit_headers = [
+                (b"x-ratelimit-limit", str(self.calls).encode("latin-1")),
+                (b"x-ratelimit-remaining", str(tokens).encode("latin-1")),
+                (b"x-ratelimit-reset",
+                 str((self.calls - tokens) * self._period_ms
+                     // self.calls // 1000).encode("latin-1")),
+            ]
+
+        # ---- 计时 + 响应头注入（单层send包装）----
+        status_code = 500
+
+        async def send_wrapped(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message["headers"]) + limit_headers
+                if log_enabled:
+                    duration = (time.perf_counter_ns() - start_ns) / 1e9
+                    headers.append(
+                        (b"x-response-time",
+                         f"{duration:.3f}".encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        # ---- 错误处理（MRO查表分发）----
+        try:
+            await self.app(scope, receive, send_wrapped)
+        except Exception as e:
+            handlers = self._HANDLERS
+            for klass in type(e).__mro__:
+                mapped = handlers.get(klass)
+                if mapped is not None:
+                    return await _send_json(send, mapped, str(e))
+            logger.error("Unhandled exception: %s", e, exc_info=True)
+            return await _send_body(send, 500, _BODY_INTERNAL_ERROR)
+
+        if log_enabled:
+            logger.info("%s", orjson.dumps({
+                "method": method,
+                "path": path,
+                "status": status_code,
+                "duration_ms": (time.perf_counter_ns() - start_ns)
+                // 1_000_000,
+            }).decode())
+
+    async def _sweep(self) -> None:
+        """周期性丢弃已恢复到满桶的空闲客户端，防止状态无限增长"""
+        while True:
+            await asyncio.sleep(self.period)
+            if self._state:
+                self._compact()
+
+    def _compact(self) -> None:
+        """丢弃超过2个周期未活动的客户端"""
+        now_ms = self._time_source() // 1_000_000 & self._MS_MASK
+        expire_ms = 2 * self._period_ms
+        self._state = {
+            client_id: packed
+            for client_id, packed in self._state.items()
+            if (now_ms - (packed & self._MS_MASK)) & self._MS_MASK < expire_ms
+        }
+
+    def _evict_oldest(self, now_ms: int) -> None:
+        """按上次补充令牌的时间批量淘汰最旧的一批客户端
+
+        持续的大量独立IP会让全部条目都处于活跃窗口内，_compact()
+        什么也清不掉；此时一次淘汰1/8容量的最久未活动条目，
+        既保证表大小有硬上界，又不至于每个新客户端都触发全表扫描。
+        """
+        evict = _MAX_TRACKED_CLIENTS // 8
+        mask = self._MS_MASK
+        for client_id, _ in heapq.nlargest(
+                evict, self._state.items(),
+                key=lambda kv: (now_ms - (kv[1] & mask)) & mask):
+            del self._state[client_id]
@@ -1,5 +1,5 @@
 from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
 
 class BrowserConfigModel(BaseModel):
@@ -41,6 +41,9 @@ class LLMExtractionModel(BaseModel):
 
 class CrawlRequest(BaseModel):
     """爬取请求模型"""
+    # 跳过未知字段扫描，直接忽略多余的请求字段
+    model_config = ConfigDict(extra="ignore")
+
     url: str
     bypass_cache: bool = False
     check_robots_txt: bool = True
@@ -53,6 +56,9 @@ class CrawlRequest(BaseModel):
 
 class CrawlBatchRequest(BaseModel):
     """批量爬取请求"""
+    # 跳过未知字段扫描，直接忽略多余的请求字段
+    model_config = ConfigDict(extra="ignore")
+
     urls: List[str]
     bypass_cache: bool = False
     check_robots_txt: bool = True
@@ -63,12 +69,17 @@ class CrawlBatchRequest(BaseModel):
 
 class DeepCrawlRequest(BaseModel):
     """深度爬取请求"""
+    # 跳过未知字段扫描，直接忽略多余的请求字段
+    model_config = ConfigDict(extra="ignore")
+
     start_url: str
     max_depth: int = 1
     max_pages: int = 10
     include_patterns: Optional[List[str]] = None
     exclude_patterns: Optional[List[str]] = None
     bypass_cache: bool = False
+    check_robots_txt: bool = True
+    word_count_threshold: int = 20
     stream: bool = False
 
 
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Any, Optional
 
 from app.models.models import (
@@ -9,7 +10,11 @@ from app.models.models import (
     CrawlResponse
 )
 from app.services.crawler_service import crawler_service  # 导入实例而不是类
-from app.utils.helpers import is_valid_url, format_error_response
+from app.utils.helpers import (
+    is_valid_url,
+    validate_urls_bulk,
+    format_error_response
+)
 
 router = APIRouter(
     prefix="/api/crawl",
@@ -18,7 +23,8 @@ router = APIRouter(
 )
 
 
-@router.post("/url", response_model=CrawlResult)
+@router.post("/url", response_model=CrawlResult,
+             response_model_exclude_none=True)
 async def crawl_single_url(request: CrawlRequest):
     """
     爬取单个URL并返回结果
@@ -31,17 +37,28 @@ async def crawl_single_url(request: CrawlRequest):
     return result
 
 
-@router.post("/batch", response_model=CrawlResponse)
+@router.post("/batch", response_model=CrawlResponse,
+             response_model_exclude_none=True)
 async def crawl_multiple_urls(request: CrawlBatchRequest):
     """
     批量爬取URL并返回结果
     """
-    # 验证URL
-    invalid_urls = [url for url in request.urls if not is_valid_url(url)]
-    if invalid_urls:
+    # 批量验证URL：单次推导完成整批校验
+    validity = validate_urls_bulk(request.urls)
+    if not all(validity):
         raise HTTPException(
             status_code=400,
-            detail=f"包含无效URL: {', '.join(invalid_urls)}"
+            detail=f"包含无效URL: {request.urls[validity.index(False)]}"
+        )
+
+    # 流式模式：以NDJSON边爬取边返回，不在内存中累积完整列表。
+    # 显式声明identity编码让GZipMiddleware原样放行：压缩器会把
+    # 小块写入攒在内部缓冲，逐行送达和背压都会被它吞掉
+    if request.stream:
+        return StreamingResponse(
+            crawler_service.stream_crawl_multiple_urls(request),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "identity"}
         )
 
     # 修复：使用实例调用
@@ -49,7 +66,8 @@ async def crawl_multiple_urls(request: CrawlBatchRequest):
     return CrawlResponse(results=results)
 
 
-@router.post("/deep", response_model=CrawlResponse)
+@router.post("/deep", response_model=CrawlResponse,
+             response_model_exclude_none=True)
 async def deep_crawl(request: DeepCrawlRequest):
     """
     深度爬取网站并返回结果
@@ -57,6 +75,15 @@ async def deep_crawl(request: DeepCrawlRequest):
     if not is_valid_url(request.start_url):
         raise HTTPException(status_code=400, detail="无效的起始URL")
 
+    # 流式模式：以NDJSON边爬取边返回，首字节延迟只取决于第一个页面。
+    # identity编码让GZipMiddleware原样放行，保证逐行即时送达
+    if request.stream:
+        return StreamingResponse(
+            crawler_service.stream_deep_crawl(request),
+            media_type="application/x-ndjson",
+            headers={"Content-Encoding": "identity"}
+        )
+
     # 修复：使用实例调用
     results = await crawler_service.deep_crawl(request)
     return CrawlResponse(results=results)
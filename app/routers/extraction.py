@@ -12,7 +12,8 @@ router = APIRouter(
 )
 
 
-@router.post("/llm", response_model=CrawlResult)
+@router.post("/llm", response_model=CrawlResult,
+             response_model_exclude_none=True)
 async def extract_with_llm(request: CrawlRequest):
     """
     使用LLM从网页提取结构化数据
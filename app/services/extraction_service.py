@@ -1,11 +1,38 @@
 import asyncio
 import json
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
-from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode, LLMConfig
+from crawl4ai import CrawlerRunConfig, CacheMode, LLMConfig
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 
 from app.models.models import CrawlRequest, CrawlResult, LLMExtractionModel
+from app.services.crawler_service import crawler_service
+
+
+@lru_cache(maxsize=64)
+def _get_llm_strategy(
+    provider: str,
+    api_token: Optional[str],
+    schema_json: str,
+    instruction: str
+) -> LLMExtractionStrategy:
+    """按(provider, token, schema, instruction)指纹缓存LLM提取策略
+
+    同一schema/instruction通常会跨大量爬取复用，
+    缓存后提示模板和schema只编译一次，lru_cache自动淘汰。
+
+    schema_json必须是排序键的规范化JSON：instruction与schema构成
+    提示词中的稳定前缀，每次调用字节级一致才能命中LLM供应商的
+    提示缓存（KV cache），任何随请求变化的内容都只应出现在
+    页面正文部分，不得混入该前缀。
+    """
+    return LLMExtractionStrategy(
+        llm_config=LLMConfig(provider=provider, api_token=api_token),
+        schema=json.loads(schema_json),
+        instruction=instruction,
+        extraction_type="schema"
+    )
 
 
 class ExtractionService:
@@ -22,25 +49,17 @@ class ExtractionService:
             )
 
         try:
-            # 配置浏览器
-            browser_config = BrowserConfig(
-                headless=True,
-                java_script_enabled=request.js_enabled,
-                viewport={"width": 1280, "height": 800}
-            )
-
-            # 配置LLM
-            llm_config = LLMConfig(
-                provider=request.llm_extraction.llm_config.provider,
-                api_token=request.llm_extraction.llm_config.api_token
-            )
+            # 配置浏览器：复用爬虫服务的统一配置，保证命中同一个暖池
+            browser_config = crawler_service._create_browser_config(
+                request.js_enabled)
 
-            # 创建LLM提取策略
-            llm_strategy = LLMExtractionStrategy(
-                llm_config=llm_config,
-                schema=request.llm_extraction.schema_data,
-                instruction=request.llm_extraction.instruction,
-                extraction_type="schema"
+            # 获取LLM提取策略（按指纹缓存，重复schema/instruction直接复用）
+            llm_strategy = _get_llm_strategy(
+                request.llm_extraction.llm_config.provider,
+                request.llm_extraction.llm_config.api_token,
+                json.dumps(request.llm_extraction.schema_data,
+                           sort_keys=True),
+                request.llm_extraction.instruction
             )
 
             # 配置爬取参数
@@ -52,21 +71,19 @@ class ExtractionService:
                 page_timeout=80000  # 增加超时时间，LLM处理可能较慢
             )
 
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                result = await crawler.arun(url=request.url, config=crawler_config)
+            # 全局并发闸门：LLM提取的爬取与其他路径共用同一配额；
+            # 从常驻爬虫池取用实例，避免每次LLM提取都冷启动浏览器
+            async with crawler_service._get_semaphore():
+                async with crawler_service.get_crawler(
+                        browser_config) as crawler:
+                    result = await crawler.arun(
+                        url=request.url, config=crawler_config)
 
-                return CrawlResult(
-                    url=request.url,
-                    success=result.success,
-                    status_code=result.status_code,
-                    markdown=result.markdown if result.success else None,
-                    extracted_content=result.extracted_content if result.success and result.extracted_content else None,
-                    error_message=result.error_message if not result.success else None,
-                    media=result.media if result.success else None,
-                    links=result.links if result.success else None
-                )
+                    # 复用爬虫服务的统一结果映射（单次success分支+免验证构建）
+                    return crawler_service._parse_crawl_result(
+                        request.url, result)
         except Exception as e:
-            return CrawlResult(
+            return CrawlResult.model_construct(
                 url=request.url,
                 success=False,
                 error_message=f"LLM提取失败: {str(e)}"
@@ -28,6 +28,11 @@ class BrowserError(CrawlerError):
     pass
 
 
-class TimeoutError(CrawlerError):
-    """超时异常"""
+class CrawlTimeoutError(CrawlerError):
+    """超时异常
+
+    注意不要命名为TimeoutError：那会遮蔽内置TimeoutError
+    （Python 3.11+中asyncio.TimeoutError的别名），导致超时
+    落入通用Exception分支并付出traceback格式化开销。
+    """
     pass